@@ -1,31 +1,46 @@
 """Metadata management for cloud server file storage."""
 
-import json
+import atexit
 import logging
 import threading
+from operator import attrgetter
 from pathlib import Path
 
+from pydantic import TypeAdapter
+
 from python_cloud_server.models import FileMetadata
 
 logger = logging.getLogger(__name__)
 
+# Building the adapter compiles the validator/serializer, so do it once at import time
+_METADATA_ADAPTER = TypeAdapter(dict[str, FileMetadata])
+
 
 class MetadataManager:
     """Thread-safe manager for file metadata with atomic operations."""
 
-    def __init__(self, metadata_filepath: Path) -> None:
+    def __init__(self, metadata_filepath: Path, flush_interval: float = 0.0) -> None:
         """Initialize the metadata manager.
 
         :param Path metadata_filepath: Path to the metadata.json file
+        :param float flush_interval: Seconds to batch changes before writing them to disk (0 writes on every change)
         """
         self.metadata_filepath = metadata_filepath
         logger.info("Initializing MetadataManager with file: %s", self.metadata_filepath)
         self.metadata_filepath.parent.mkdir(parents=True, exist_ok=True)
 
+        self.flush_interval = flush_interval
+        self._dirty = False
+        self._flush_timer: threading.Timer | None = None
+
         self._lock = threading.RLock()
         self._metadata: dict[str, FileMetadata] = {}
         self._load_metadata()
 
+        if self.flush_interval > 0:
+            # Make sure batched changes still reach the disk when the process exits
+            atexit.register(self.flush)
+
     @property
     def file_count(self) -> int:
         """Get the total number of files in the metadata.
@@ -42,10 +57,8 @@ class MetadataManager:
         temp_filepath = self.metadata_filepath.with_suffix(".tmp")
 
         try:
-            with temp_filepath.open("w", encoding="utf-8") as f:
-                json.dump(
-                    {k: v.model_dump(mode="json") for k, v in self._metadata.items()}, f, ensure_ascii=False, indent=2
-                )
+            with temp_filepath.open("wb") as f:
+                f.write(_METADATA_ADAPTER.dump_json(self._metadata, indent=2))
             temp_filepath.replace(self.metadata_filepath)
             logger.info("Saved metadata for %d files", self.file_count)
 
@@ -55,6 +68,51 @@ class MetadataManager:
                 temp_filepath.unlink()
             raise
 
+    def _mark_dirty(self) -> None:
+        """Record that the metadata has changed and save it, or schedule a save when batching writes."""
+        if self.flush_interval <= 0:
+            self._save_metadata_atomic()
+            return
+
+        self._dirty = True
+        if self._flush_timer is None:
+            self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        """Start a timer which writes the batched changes once the flush interval elapses."""
+        self._flush_timer = threading.Timer(self.flush_interval, self._scheduled_flush)
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
+
+    def _scheduled_flush(self) -> None:
+        """Flush from the timer thread, retrying after another interval if the save fails."""
+        # The change that triggered this flush has already been acknowledged, so a failed save is only retried here and
+        # never reaches the request handlers that roll back on metadata errors
+        try:
+            self.flush()
+        except Exception:
+            logger.warning("Batched metadata flush failed, retrying in %s seconds", self.flush_interval)
+            with self._lock:
+                if self._dirty and self._flush_timer is None:
+                    self._schedule_flush()
+
+    def flush(self) -> None:
+        """Write any batched metadata changes to disk."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+
+            if self._dirty:
+                self._save_metadata_atomic()
+                self._dirty = False
+
+    def close(self) -> None:
+        """Write any batched metadata changes to disk and stop flushing them at process exit."""
+        self.flush()
+        if self.flush_interval > 0:
+            atexit.unregister(self.flush)
+
     def _load_metadata(self) -> None:
         """Load metadata from disk into memory."""
         with self._lock:
@@ -65,9 +123,7 @@ class MetadataManager:
                 return
 
             try:
-                with self.metadata_filepath.open(encoding="utf-8") as f:
-                    data = json.load(f)
-                self._metadata = {k: FileMetadata.model_validate(v) for k, v in data.items()}
+                self._metadata = _METADATA_ADAPTER.validate_json(self.metadata_filepath.read_bytes())
                 logger.info("Loaded metadata for %d files", self.file_count)
             except Exception:
                 logger.exception("Failed to load metadata!")
@@ -88,12 +144,10 @@ class MetadataManager:
         :return list[FileMetadata]: List of file metadata objects
         """
         with self._lock:
-            files = [
-                FileMetadata.model_validate(data) for data in self._metadata.values() if tag is None or tag in data.tags
-            ]
+            files = [data for data in self._metadata.values() if tag is None or tag in data.tags]
 
-            files.sort(key=lambda f: f.uploaded_at, reverse=True)
-            return files
+        files.sort(key=attrgetter("uploaded_at"), reverse=True)
+        return files
 
     def get_file_entry(self, filepath: str) -> FileMetadata | None:
         """Get a file entry from the metadata.
@@ -101,10 +155,7 @@ class MetadataManager:
         :param str filepath: The file path to retrieve
         :return FileMetadata | None: The file metadata or None if not found
         """
-        with self._lock:
-            if (data := self._metadata.get(filepath)) is None:
-                return None
-            return FileMetadata.model_validate(data)
+        return self._metadata.get(filepath)
 
     def add_file_entries(self, file_metadata_list: list[FileMetadata]) -> None:
         """Add new file entries to the metadata.
@@ -118,7 +169,7 @@ class MetadataManager:
                     self._metadata[file_metadata.filepath] = file_metadata
                     _changes_applied = True
             if _changes_applied:
-                self._save_metadata_atomic()
+                self._mark_dirty()
 
     def delete_file_entries(self, filepaths: list[str]) -> None:
         """Delete file entries from the metadata.
@@ -133,7 +184,7 @@ class MetadataManager:
                     _changes_applied = True
 
             if _changes_applied:
-                self._save_metadata_atomic()
+                self._mark_dirty()
 
     def update_file_entry(self, filepath: str, updates: dict) -> None:
         """Update a file entry in the metadata.
@@ -157,5 +208,5 @@ class MetadataManager:
                 self._metadata[new_filepath] = self._metadata.pop(filepath)
                 logger.info("Filepath updated from %s to %s", filepath, new_filepath)
 
-            self._save_metadata_atomic()
+            self._mark_dirty()
             logger.info("Updated file entry: %s", filepath)
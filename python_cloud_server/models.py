@@ -18,6 +18,9 @@ class StorageConfig(BaseModel):
     max_tags_per_file: int = Field(default=10, description="Maximum number of tags per file.")
     max_tag_length: int = Field(default=50, description="Maximum length of a tag.")
     thumbnail_size: int = Field(default=200, description="Thumbnail size in pixels (width and height).")
+    metadata_flush_interval_ms: int = Field(
+        default=0, ge=0, description="Delay for batching metadata writes in ms (0 writes on every change)."
+    )
 
 
 class CloudServerConfig(TemplateServerConfig):
@@ -1,10 +1,17 @@
 """Cloud server module."""
 
+import asyncio
 import logging
 import mimetypes
-from pathlib import Path
-
-from fastapi import HTTPException, Request, UploadFile
+import os
+from collections.abc import AsyncIterator, Mapping
+from contextlib import asynccontextmanager
+from functools import cached_property, lru_cache
+from io import BufferedWriter
+from pathlib import Path, PurePath
+from typing import Any, BinaryIO
+
+from fastapi import FastAPI, HTTPException, Request, UploadFile
 from fastapi.responses import FileResponse
 from python_template_server.constants import MB_TO_BYTES, ROOT_DIR
 from python_template_server.models import ResponseCode
@@ -25,6 +32,54 @@ from python_cloud_server.thumbnails import ThumbnailGenerator
 
 logger = logging.getLogger(__name__)
 
+# Anonymous uploads are created with O_TMPFILE (Linux-only) and named by linking their /proc file descriptor
+_SUPPORTS_ANONYMOUS_FILES = hasattr(os, "O_TMPFILE") and Path("/proc/self/fd").is_dir()
+
+
+@lru_cache(maxsize=256)
+def _guess_mime_type(suffixes: str) -> str | None:
+    """Guess the MIME type for a file extension, caching the result per extension.
+
+    :param str suffixes: The file extension(s), including the leading dot (e.g. '.png' or '.tar.gz')
+    :return str | None: The guessed MIME type, or None if the extension is not recognized
+    """
+    guessed_type, _ = mimetypes.guess_type(f"file{suffixes}")
+    return guessed_type
+
+
+def _open_upload_file(full_path: Path) -> tuple[BufferedWriter, bool]:
+    """Open a file to receive an upload, anonymous until linked into place where the platform supports it.
+
+    :param Path full_path: The destination file path
+    :return tuple[BufferedWriter, bool]: The open file, and whether it is anonymous (O_TMPFILE) and still needs linking
+    """
+    if not _SUPPORTS_ANONYMOUS_FILES:
+        return full_path.open("wb"), False
+
+    try:
+        fd = os.open(full_path.parent, os.O_TMPFILE | os.O_WRONLY, 0o666)
+    except OSError:
+        # Not every filesystem supports O_TMPFILE, so write to the destination directly
+        return full_path.open("wb"), False
+    return os.fdopen(fd, "wb"), True
+
+
+def _link_upload_file(upload_file: BufferedWriter, full_path: Path) -> None:
+    """Give a fully written anonymous upload its name in the storage directory.
+
+    :param BufferedWriter upload_file: The anonymous file holding the upload
+    :param Path full_path: The destination file path
+    """
+    upload_file.flush()
+    # Replace any untracked file already at the destination, as writing to it directly would
+    full_path.unlink(missing_ok=True)
+    dir_fd = os.open(full_path.parent, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        # Passing a dir_fd makes os.link call linkat with AT_SYMLINK_FOLLOW, which resolves the /proc fd link
+        os.link(f"/proc/self/fd/{upload_file.fileno()}", full_path.name, dst_dir_fd=dir_fd)
+    finally:
+        os.close(dir_fd)
+
 
 class CloudServer(TemplateServer):
     """FastAPI cloud server."""
@@ -39,24 +94,25 @@ class CloudServer(TemplateServer):
 
         self._initialize_storage()
         self._initialize_metadata()
+        self._flush_metadata_on_shutdown()
         self._initialize_thumbnails()
 
-    @property
+    @cached_property
     def server_directory(self) -> Path:
         """Get the server directory path."""
         return Path(ROOT_DIR) / "server"
 
-    @property
+    @cached_property
     def storage_directory(self) -> Path:
         """Get the storage directory path."""
         return self.server_directory / "storage"
 
-    @property
+    @cached_property
     def thumbnails_directory(self) -> Path:
         """Get the thumbnails directory path."""
         return self.storage_directory / ".thumbnails"
 
-    @property
+    @cached_property
     def metadata_filepath(self) -> Path:
         """Get the metadata file path."""
         return self.server_directory / "metadata.json"
@@ -134,7 +190,10 @@ class CloudServer(TemplateServer):
 
     def _initialize_metadata(self) -> None:
         """Initialize metadata manager."""
-        self.metadata_manager = MetadataManager(self.metadata_filepath)
+        self.metadata_manager = MetadataManager(
+            self.metadata_filepath,
+            flush_interval=self.config.storage_config.metadata_flush_interval_ms / 1000,
+        )
         with self.metadata_manager._lock:
             # Add existing files on disk to metadata if missing
             filepaths_to_add: list[FileMetadata] = []
@@ -171,6 +230,20 @@ class CloudServer(TemplateServer):
 
         logger.info("Metadata manager initialized with %d files", self.metadata_manager.file_count)
 
+    def _flush_metadata_on_shutdown(self) -> None:
+        """Wrap the app's lifespan so batched metadata changes are written to disk when the server shuts down."""
+        lifespan_context = self.app.router.lifespan_context
+
+        @asynccontextmanager
+        async def lifespan(app: FastAPI) -> AsyncIterator[Mapping[str, Any] | None]:
+            async with lifespan_context(app) as state:
+                try:
+                    yield state
+                finally:
+                    self.metadata_manager.close()
+
+        self.app.router.lifespan_context = lifespan
+
     def _initialize_thumbnails(self) -> None:
         """Initialize thumbnail generator and sync thumbnails with files."""
         self.thumbnails_directory.mkdir(parents=True, exist_ok=True)
@@ -216,19 +289,11 @@ class CloudServer(TemplateServer):
         """
         logger.info("Received get thumbnail request for: %s", filepath)
 
-        if not self.metadata_manager.file_exists(filepath=filepath):
+        if (file_metadata := self.metadata_manager.get_file_entry(filepath=filepath)) is None:
             msg = f"File not found in metadata: {filepath}"
             logger.error(msg)
             raise HTTPException(status_code=ResponseCode.NOT_FOUND, detail=msg)
 
-        if (
-            not (file_metadata := self.metadata_manager.get_file_entry(filepath=filepath))
-            or not file_metadata.mime_type
-        ):
-            msg = f"File metadata not found: {filepath}"
-            logger.error(msg)
-            raise HTTPException(status_code=ResponseCode.NOT_FOUND, detail=msg)
-
         if not (file_metadata.mime_type.startswith("image/") or file_metadata.mime_type.startswith("video/")):
             msg = f"Thumbnails only available for images and videos: {filepath}"
             logger.error(msg)
@@ -244,7 +309,7 @@ class CloudServer(TemplateServer):
 
             try:
                 thumbnail_path.parent.mkdir(parents=True, exist_ok=True)
-                self.thumbnail_generator.generate_thumbnail(
+                await self.thumbnail_generator.generate_thumbnail_async(
                     file_path=source_path, mime_type=file_metadata.mime_type, output_path=thumbnail_path
                 )
                 logger.info("Generated thumbnail on demand: %s", filepath)
@@ -290,20 +355,25 @@ class CloudServer(TemplateServer):
             logger.error(msg)
             raise HTTPException(status_code=ResponseCode.FORBIDDEN, detail=msg)
 
-        if not self.metadata_manager.file_exists(filepath=filepath):
+        if (file_metadata := self.metadata_manager.get_file_entry(filepath=filepath)) is None:
             msg = f"File not found in metadata: {filepath}"
             logger.error(msg)
             raise HTTPException(status_code=ResponseCode.NOT_FOUND, detail=msg)
 
-        if not (full_path := self.storage_directory / filepath).exists():
+        full_path = self.storage_directory / filepath
+        try:
+            # Stat once here and hand the result to FileResponse so it doesn't stat the file again
+            stat_result = full_path.stat()
+        except FileNotFoundError as e:
             msg = f"File not found on disk: {filepath}"
-            logger.error(msg)
-            raise HTTPException(status_code=ResponseCode.NOT_FOUND, detail=msg)
+            logger.error(msg)  # noqa: TRY400
+            raise HTTPException(status_code=ResponseCode.NOT_FOUND, detail=msg) from e
 
         return FileResponse(
             path=full_path,
-            media_type=self.metadata_manager.get_file_entry(filepath=filepath).mime_type,  # type: ignore[union-attr]
+            media_type=file_metadata.mime_type,
             filename=full_path.name,
+            stat_result=stat_result,
         )
 
     def _check_file_too_large(self, full_path: Path, file_size: int) -> None:
@@ -319,6 +389,30 @@ class CloudServer(TemplateServer):
             logger.error(msg)
             raise ValueError(msg)
 
+    def _write_upload(self, source: BinaryIO, full_path: Path) -> int:
+        """Copy an uploaded file to disk in chunks, enforcing the maximum file size.
+
+        Where possible the file is written anonymously and only linked to its destination once complete, so a failed
+        or interrupted upload never leaves a partial file behind.
+
+        :param BinaryIO source: The uploaded file's underlying file object
+        :param Path full_path: The destination file path
+        :return int: The number of bytes written
+        :raise ValueError: If file size exceeds maximum limit
+        """
+        chunk_size = self.config.storage_config.upload_chunk_size_kb * 1024
+        file_size = 0
+        upload_file, is_anonymous = _open_upload_file(full_path)
+        with upload_file:
+            while chunk := source.read(chunk_size):
+                file_size += len(chunk)
+                self._check_file_too_large(full_path=full_path, file_size=file_size)
+                upload_file.write(chunk)
+
+            if is_anonymous:
+                _link_upload_file(upload_file, full_path)
+        return file_size
+
     async def post_file(self, request: Request, filepath: str, file: UploadFile) -> PostFileResponse:
         """Handle post file requests - upload a file.
 
@@ -336,19 +430,18 @@ class CloudServer(TemplateServer):
             raise HTTPException(status_code=ResponseCode.CONFLICT, detail=msg)
 
         if (mime_type := file.content_type or "application/octet-stream") == "application/octet-stream":
-            guessed_type, _ = mimetypes.guess_type(filepath)
-            mime_type = guessed_type or mime_type
+            mime_type = _guess_mime_type("".join(PurePath(filepath).suffixes)) or mime_type
 
         full_path = self.storage_directory / filepath
         full_path.parent.mkdir(parents=True, exist_ok=True)
-        file_size = 0
 
         try:
-            with full_path.open("wb") as f:
-                while chunk := await file.read(self.config.storage_config.upload_chunk_size_kb * 1024):
-                    file_size += len(chunk)
-                    self._check_file_too_large(full_path=full_path, file_size=file_size)
-                    f.write(chunk)
+            # Reject uploads whose declared size is already over the limit before writing any bytes
+            if file.size is not None:
+                self._check_file_too_large(full_path=full_path, file_size=file.size)
+
+            # Copy the whole upload in one worker thread rather than hopping threads for every chunk
+            file_size = await asyncio.to_thread(self._write_upload, file.file, full_path)
         except Exception as e:
             full_path.unlink(missing_ok=True)
             msg = f"Failed to save file: {filepath}"
@@ -362,7 +455,7 @@ class CloudServer(TemplateServer):
                 size=file_size,
                 tags=[],
             )
-            self.metadata_manager.add_file_entries(file_metadata_list=[file_metadata])
+            await asyncio.to_thread(self.metadata_manager.add_file_entries, file_metadata_list=[file_metadata])
         except Exception as e:
             full_path.unlink(missing_ok=True)
             msg = f"Failed to save metadata for file: {filepath}"
@@ -373,7 +466,7 @@ class CloudServer(TemplateServer):
             try:
                 thumbnail_path = self.thumbnails_directory / f"{filepath}.jpg"
                 thumbnail_path.parent.mkdir(parents=True, exist_ok=True)
-                self.thumbnail_generator.generate_thumbnail(
+                await self.thumbnail_generator.generate_thumbnail_async(
                     file_path=full_path, mime_type=mime_type, output_path=thumbnail_path
                 )
                 logger.info("Generated thumbnail for uploaded file: %s", filepath)
@@ -399,14 +492,13 @@ class CloudServer(TemplateServer):
         patch_request = PatchFileRequest.model_validate(await request.json())
         logger.info("Received patch file request for: %s", filepath)
 
-        if not self.metadata_manager.file_exists(filepath=filepath):
+        if (current_metadata := self.metadata_manager.get_file_entry(filepath=filepath)) is None:
             msg = f"File not found in metadata: {filepath}"
             logger.error(msg)
             raise HTTPException(status_code=ResponseCode.NOT_FOUND, detail=msg)
 
         # Calculate new tags
-        current_metadata = self.metadata_manager.get_file_entry(filepath=filepath)
-        new_tags = set(current_metadata.tags).copy()  # type: ignore[union-attr]
+        new_tags = set(current_metadata.tags)
 
         for tag in patch_request.add_tags:
             if len(tag) > self.config.storage_config.max_tag_length:
@@ -465,6 +557,7 @@ class CloudServer(TemplateServer):
             if final_filepath != filepath:
                 updates["filepath"] = final_filepath
 
+            # Stay on the event loop so no other request can touch this entry between the check and the update
             self.metadata_manager.update_file_entry(filepath=filepath, updates=updates)
 
         except Exception as e:
@@ -510,6 +603,7 @@ class CloudServer(TemplateServer):
             raise HTTPException(status_code=ResponseCode.INTERNAL_SERVER_ERROR, detail=msg) from e
 
         try:
+            # Kept synchronous so no other handler can run between the metadata check and this delete
             self.metadata_manager.delete_file_entries(filepaths=[filepath])
         except Exception as e:
             msg = f"Failed to delete metadata for file: {filepath}"
@@ -1,6 +1,8 @@
 """Thumbnail generation for images and videos."""
 
+import asyncio
 import logging
+import uuid
 from pathlib import Path
 
 import cv2
@@ -8,6 +10,25 @@ from PIL import Image
 
 logger = logging.getLogger(__name__)
 
+# Image thumbnails are box-reduced to within this factor of the target size before the final resample
+_REDUCING_GAP = 2
+
+
+def _save_thumbnail(img: Image.Image, output_path: Path) -> None:
+    """Save a JPEG thumbnail through a temporary file so readers never see a partly written thumbnail.
+
+    :param Image.Image img: The thumbnail image
+    :param Path output_path: Path to save thumbnail
+    """
+    # Unique per call, so concurrent generations of the same thumbnail never write to the same file
+    temp_path = output_path.with_name(f".{output_path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        img.save(temp_path, "JPEG", quality=82, optimize=True, progressive=True)
+        temp_path.replace(output_path)
+    except Exception:
+        temp_path.unlink(missing_ok=True)
+        raise
+
 
 class ThumbnailGenerator:
     """Generate thumbnails for images and videos."""
@@ -31,16 +52,21 @@ class ThumbnailGenerator:
             output_path.parent.mkdir(parents=True, exist_ok=True)
 
             with Image.open(image_path) as img:
-                new_img = img.copy()
-                if img.mode == "RGBA":
-                    background = Image.new("RGB", img.size, (255, 255, 255))
-                    background.paste(img, mask=img.split()[3])  # Use alpha channel as mask
+                if img.format == "JPEG":
+                    # Shrink the JPEG decode so the RGB conversion below for greyscale/CMYK sources runs on fewer pixels
+                    width, height = self.thumbnail_size
+                    img.draft("RGB", (width * _REDUCING_GAP, height * _REDUCING_GAP))
+
+                new_img = img if img.mode in ("RGB", "RGBA") else img.convert("RGB")
+
+                # Resize before flattening transparency so the composite only touches thumbnail-sized pixels
+                new_img.thumbnail(self.thumbnail_size, Image.Resampling.BILINEAR, reducing_gap=_REDUCING_GAP)
+                if new_img.mode == "RGBA":
+                    background = Image.new("RGB", new_img.size, (255, 255, 255))
+                    background.paste(new_img, mask=new_img.getchannel("A"))  # Use alpha channel as mask
                     new_img = background
-                elif img.mode != "RGB":
-                    new_img = img.convert("RGB")
 
-                new_img.thumbnail(self.thumbnail_size, Image.Resampling.LANCZOS)
-                new_img.save(output_path, "JPEG", quality=85, optimize=True)
+                _save_thumbnail(new_img, output_path)
 
             logger.info("Generated image thumbnail: %s", output_path)
         except Exception:
@@ -65,12 +91,13 @@ class ThumbnailGenerator:
                 logger.error("Could not open video file: %s", video_path)
                 return False
 
-            fps = video.get(cv2.CAP_PROP_FPS)
-            if fps > 0:
-                target_frame = int(fps * 1.0)  # 1 second
-                video.set(cv2.CAP_PROP_POS_FRAMES, target_frame)
-
+            # Seek by timestamp so the decoder can jump to the nearest keyframe instead of counting frames
+            video.set(cv2.CAP_PROP_POS_MSEC, 1000)  # 1 second
             success, frame = video.read()
+            if not success:
+                # Videos shorter than the seek target fall back to the first frame
+                video.set(cv2.CAP_PROP_POS_MSEC, 0)
+                success, frame = video.read()
             video.release()
 
             if not success or frame is None:
@@ -81,7 +108,7 @@ class ThumbnailGenerator:
             img = Image.fromarray(frame_rgb)
             img.thumbnail(self.thumbnail_size, Image.Resampling.LANCZOS)
 
-            img.save(output_path, "JPEG", quality=85, optimize=True)
+            _save_thumbnail(img, output_path)
             logger.info("Generated video thumbnail: %s", output_path)
         except Exception:
             logger.exception("Failed to generate video thumbnail for %s", video_path)
@@ -102,3 +129,12 @@ class ThumbnailGenerator:
             self.generate_video_thumbnail(file_path, output_path)
 
         logger.debug("No thumbnail generator for MIME type: %s", mime_type)
+
+    async def generate_thumbnail_async(self, file_path: Path, mime_type: str, output_path: Path) -> None:
+        """Generate thumbnail based on MIME type in a worker thread, keeping the event loop free.
+
+        :param Path file_path: Path to source file
+        :param str mime_type: MIME type of the file
+        :param Path output_path: Path to save thumbnail
+        """
+        await asyncio.to_thread(self.generate_thumbnail, file_path, mime_type, output_path)
@@ -1,16 +1,36 @@
 """Pytest fixtures for the application's unit tests."""
 
+import shutil
+import sys
+import tempfile
 from collections.abc import Generator
 from pathlib import Path
 from unittest.mock import MagicMock, mock_open, patch
 
 import pytest
+from fastapi import Request
 from PIL import Image
+from python_template_server import template_server
 
+# Import the server module (and with it FastAPI) when conftest loads so the first test is not charged for it
+import python_cloud_server.server  # noqa: F401
 from python_cloud_server.metadata import MetadataManager
 from python_cloud_server.models import CloudServerConfig, FileMetadata, StorageConfig
 from python_cloud_server.thumbnails import ThumbnailGenerator
 
+_METADATA_DICT = {
+    "Name": "python-cloud-server",
+    "Version": "0.1.0",
+    "Summary": "A lightweight FastAPI cloud server.",
+}
+
+
+class _FakePackageMetadata:
+    """Lightweight stand-in for PackageMetadata which only supports key lookups."""
+
+    __getitem__ = staticmethod(_METADATA_DICT.__getitem__)
+    get = staticmethod(_METADATA_DICT.get)
+
 
 # General fixtures
 @pytest.fixture
@@ -34,8 +54,22 @@ def mock_rename_file() -> Generator[MagicMock]:
         yield mock_rename
 
 
+@pytest.fixture(scope="session")
+def mock_pkg_metadata() -> _FakePackageMetadata:
+    """Provide a fake PackageMetadata, built once per session."""
+    return _FakePackageMetadata()
+
+
+@pytest.fixture(scope="session")
+def mock_package_metadata(mock_pkg_metadata: _FakePackageMetadata) -> Generator[MagicMock]:
+    """Mock importlib.metadata.metadata to return a mock PackageMetadata, patched once per session."""
+    with patch.object(template_server, "metadata") as mock_metadata:
+        mock_metadata.return_value = mock_pkg_metadata
+        yield mock_metadata
+
+
 # Cloud Server Configuration Models
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_storage_config_dict() -> dict:
     """Provide a mock storage configuration dictionary."""
     return {
@@ -45,23 +79,37 @@ def mock_storage_config_dict() -> dict:
         "max_tags_per_file": 10,
         "max_tag_length": 50,
         "thumbnail_size": 200,
+        "metadata_flush_interval_ms": 0,
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_storage_config(mock_storage_config_dict: dict) -> StorageConfig:
     """Provide a mock StorageConfig instance."""
     return StorageConfig.model_validate(mock_storage_config_dict)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_cloud_server_config(mock_storage_config: StorageConfig) -> CloudServerConfig:
     """Provide a mock CloudServerConfig instance with temporary storage."""
     return CloudServerConfig(storage_config=mock_storage_config)
 
 
+@pytest.fixture(scope="session")
+def mock_cloud_server_config_dict(mock_cloud_server_config: CloudServerConfig) -> dict:
+    """Provide the mock CloudServerConfig dumped to a dictionary."""
+    return mock_cloud_server_config.model_dump()  # type: ignore[no-any-return]
+
+
+# Request
+@pytest.fixture(scope="session")
+def mock_request_object() -> Request:
+    """Provide a mock Request object, built once per session."""
+    return MagicMock(spec=Request)
+
+
 # File Metadata Model
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_file_metadata_dict() -> dict:
     """Provide a mock file metadata dictionary."""
     return {
@@ -84,10 +132,26 @@ def mock_file_metadata(mock_file_metadata_dict: dict) -> FileMetadata:
 
 
 # Server fixtures
+@pytest.fixture(scope="session")
+def mock_memory_root(tmp_path_factory: pytest.TempPathFactory) -> Generator[Path]:
+    """Provide a session directory in shared memory, falling back to pytest's temporary directory.
+
+    Server tests write and rename many small files, so keeping them on tmpfs avoids disk latency on CI.
+    """
+    shm_path = Path("/dev/shm")  # noqa: S108 - mkdtemp below creates a private, uniquely named directory
+    if sys.platform != "linux" or not shm_path.is_dir():
+        yield tmp_path_factory.mktemp("memory")
+        return
+
+    memory_root = Path(tempfile.mkdtemp(prefix="python-cloud-server-", dir=shm_path))
+    yield memory_root
+    shutil.rmtree(memory_root, ignore_errors=True)
+
+
 @pytest.fixture
-def mock_server_root_path(tmp_path: Path) -> Path:
+def mock_server_root_path(mock_memory_root: Path) -> Path:
     """Create a temporary server root path."""
-    server_root = tmp_path / "server"
+    server_root = Path(tempfile.mkdtemp(dir=mock_memory_root)) / "server"
     server_root.mkdir(parents=True, exist_ok=True)
     return server_root
 
@@ -1,8 +1,9 @@
 """Unit tests for the metadata manager."""
 
 import json
+from collections.abc import Generator
 from pathlib import Path
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import pytest
 
@@ -166,3 +167,90 @@ class TestMetadataManagerOperations:
         nonexistent_file = "nonexistent/file.txt"
         with pytest.raises(KeyError, match=f"File {nonexistent_file} not found!"):
             mock_metadata_manager.update_file_entry(nonexistent_file, {})
+
+
+class TestMetadataManagerBatchedWrites:
+    """Unit tests for MetadataManager batched (debounced) writes."""
+
+    @pytest.fixture
+    def mock_batched_metadata_manager(
+        self, mock_metadata_manager: MetadataManager
+    ) -> Generator[tuple[MetadataManager, MagicMock]]:
+        """Create a metadata manager which batches writes, with atexit registration mocked."""
+        with patch("python_cloud_server.metadata.atexit") as mock_atexit:
+            metadata_manager = MetadataManager(mock_metadata_manager.metadata_filepath, flush_interval=60.0)
+            yield metadata_manager, mock_atexit
+            metadata_manager.flush()
+
+    def test_flush_registered_at_exit(self, mock_batched_metadata_manager: tuple[MetadataManager, MagicMock]) -> None:
+        """Test that batching managers flush pending changes when the process exits."""
+        metadata_manager, mock_atexit = mock_batched_metadata_manager
+        mock_atexit.register.assert_called_once_with(metadata_manager.flush)
+
+    def test_changes_written_on_flush(
+        self, mock_batched_metadata_manager: tuple[MetadataManager, MagicMock], mock_file_metadata: FileMetadata
+    ) -> None:
+        """Test that changes stay in memory until flushed."""
+        metadata_manager, _ = mock_batched_metadata_manager
+        metadata_manager.delete_file_entries([mock_file_metadata.filepath])
+
+        assert metadata_manager.get_file_entry(mock_file_metadata.filepath) is None
+        assert mock_file_metadata.filepath in json.loads(metadata_manager.metadata_filepath.read_bytes())
+
+        metadata_manager.flush()
+
+        assert mock_file_metadata.filepath not in json.loads(metadata_manager.metadata_filepath.read_bytes())
+        assert metadata_manager._flush_timer is None
+
+    def test_flush_without_changes(self, mock_batched_metadata_manager: tuple[MetadataManager, MagicMock]) -> None:
+        """Test that flushing without pending changes does not write to disk."""
+        metadata_manager, _ = mock_batched_metadata_manager
+
+        with patch.object(metadata_manager, "_save_metadata_atomic") as mock_save:
+            metadata_manager.flush()
+
+        mock_save.assert_not_called()
+
+    def test_changes_written_after_interval(
+        self, mock_metadata_manager: MetadataManager, mock_file_metadata: FileMetadata
+    ) -> None:
+        """Test that batched changes are written once the flush interval elapses."""
+        with patch("python_cloud_server.metadata.atexit"):
+            metadata_manager = MetadataManager(mock_metadata_manager.metadata_filepath, flush_interval=0.01)
+
+        metadata_manager.delete_file_entries([mock_file_metadata.filepath])
+        flush_timer = metadata_manager._flush_timer
+        assert flush_timer is not None
+        flush_timer.join()
+
+        assert mock_file_metadata.filepath not in json.loads(metadata_manager.metadata_filepath.read_bytes())
+        assert metadata_manager._flush_timer is None
+
+    def test_failed_timer_flush_is_rescheduled(
+        self, mock_metadata_manager: MetadataManager, mock_file_metadata: FileMetadata
+    ) -> None:
+        """Test that a failed save on the timer thread keeps the changes pending and schedules another flush."""
+        with patch("python_cloud_server.metadata.atexit"):
+            metadata_manager = MetadataManager(mock_metadata_manager.metadata_filepath, flush_interval=60.0)
+
+        metadata_manager.delete_file_entries([mock_file_metadata.filepath])
+        with patch.object(metadata_manager, "_save_metadata_atomic", side_effect=OSError("Disk full")):
+            metadata_manager._scheduled_flush()
+
+        assert metadata_manager._dirty
+        assert metadata_manager._flush_timer is not None
+
+        metadata_manager.flush()
+        assert mock_file_metadata.filepath not in json.loads(metadata_manager.metadata_filepath.read_bytes())
+
+    def test_close(
+        self, mock_batched_metadata_manager: tuple[MetadataManager, MagicMock], mock_file_metadata: FileMetadata
+    ) -> None:
+        """Test that closing writes pending changes and removes the exit hook."""
+        metadata_manager, mock_atexit = mock_batched_metadata_manager
+        metadata_manager.delete_file_entries([mock_file_metadata.filepath])
+
+        metadata_manager.close()
+
+        assert mock_file_metadata.filepath not in json.loads(metadata_manager.metadata_filepath.read_bytes())
+        mock_atexit.unregister.assert_called_once_with(metadata_manager.flush)
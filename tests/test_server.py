@@ -1,18 +1,23 @@
 """Unit tests for the python_cloud_server.server module."""
 
 import asyncio
-from collections.abc import Generator
-from importlib.metadata import PackageMetadata
+import shutil
+import tempfile
+from collections.abc import AsyncGenerator, Generator
+from contextlib import ExitStack
+from functools import cached_property
 from io import BytesIO
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from fastapi import HTTPException, Request, Security, UploadFile
+from fastapi.datastructures import Headers
 from fastapi.responses import FileResponse
 from fastapi.routing import APIRoute
 from fastapi.security import APIKeyHeader
-from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
+from PIL import Image
 from python_template_server.constants import MB_TO_BYTES
 from python_template_server.models import ResponseCode
 
@@ -26,76 +31,122 @@ from python_cloud_server.models import (
     PatchFileRequest,
     PatchFileResponse,
     PostFileResponse,
+    StorageConfig,
 )
 from python_cloud_server.server import CloudServer
-from python_cloud_server.thumbnails import ThumbnailGenerator
 
+_STORAGE_CONFIG = StorageConfig()
+_MAX_TAGS = _STORAGE_CONFIG.max_tags_per_file
+_TAG_BATCH = tuple(f"tag{i}" for i in range(_MAX_TAGS))
+_MAX_TAG_LENGTH = _STORAGE_CONFIG.max_tag_length
+_LONG_TAG = "a" * (_MAX_TAG_LENGTH + 1)
 
-@pytest.fixture(autouse=True)
-def mock_package_metadata() -> Generator[MagicMock]:
-    """Mock importlib.metadata.metadata to return a mock PackageMetadata."""
-    with patch("python_template_server.template_server.metadata") as mock_metadata:
-        mock_pkg_metadata = MagicMock(spec=PackageMetadata)
-        metadata_dict = {
-            "Name": "python-cloud-server",
-            "Version": "0.1.0",
-            "Summary": "A lightweight FastAPI cloud server.",
-        }
-        mock_pkg_metadata.__getitem__.side_effect = lambda key: metadata_dict[key]
-        mock_metadata.return_value = mock_pkg_metadata
-        yield mock_metadata
+_API_KEY_SECURITY = Security(APIKeyHeader(name="X-API-Key", auto_error=False))
 
 
-@pytest.fixture
-def mock_server(
+async def _fake_verify_api_key(api_key: str | None = _API_KEY_SECURITY) -> None:
+    """Fake verify API key that accepts the security header and always succeeds in tests."""
+    return
+
+
+class _MockCloudServer(CloudServer):
+    """CloudServer rooted in a temporary directory instead of the package's server directory."""
+
+    def __init__(self, config: CloudServerConfig, server_root: Path) -> None:
+        """Initialize the server with its directories under the given root.
+
+        :param CloudServerConfig config: Server configuration
+        :param Path server_root: Root directory for storage and metadata
+        """
+        self._server_root = server_root
+        super().__init__(config)
+
+    @cached_property
+    def server_directory(self) -> Path:
+        """Get the temporary server directory path."""
+        return self._server_root
+
+
+@pytest.fixture(scope="session")
+def _mock_server_directory_template(mock_memory_root: Path, mock_file_metadata_dict: dict) -> Path:
+    """Create a server directory holding the mock file and its metadata, built once per session."""
+    template_root = Path(tempfile.mkdtemp(prefix="server_template", dir=mock_memory_root))
+    file_metadata = FileMetadata.new_current_instance(**mock_file_metadata_dict)
+
+    file_path = template_root / "storage" / file_metadata.filepath
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.write_text("test content")
+    (template_root / "storage" / ".thumbnails").mkdir()
+
+    MetadataManager(template_root / "metadata.json").add_file_entries([file_metadata])
+    return template_root
+
+
+@pytest.fixture(scope="module")
+def _mock_server_template(
+    mock_memory_root: Path,
+    _mock_server_directory_template: Path,
     mock_cloud_server_config: CloudServerConfig,
-    mock_metadata_manager: MetadataManager,
-    mock_server_root_path: Path,
-    mock_thumbnail_generator: ThumbnailGenerator,
+    mock_package_metadata: MagicMock,
 ) -> Generator[CloudServer]:
-    """Provide a CloudServer instance for testing."""
-
-    async def fake_verify_api_key(
-        api_key: str | None = Security(APIKeyHeader(name="X-API-Key", auto_error=False)),
-    ) -> None:
-        """Fake verify API key that accepts the security header and always succeeds in tests."""
-        return
-
-    storage_path = mock_server_root_path / "storage"
-    thumbnails_path = mock_server_root_path / "storage" / ".thumbnails"
-
-    with (
-        patch.object(CloudServer, "_verify_api_key", new=fake_verify_api_key),
-        patch.object(CloudServer, "server_directory", property(lambda self: mock_server_root_path)),
-        patch.object(CloudServer, "storage_directory", property(lambda self: storage_path)),
-        patch.object(CloudServer, "thumbnails_directory", property(lambda self: thumbnails_path)),
-        patch.object(CloudServer, "metadata_filepath", property(lambda self: mock_server_root_path / "metadata.json")),
-        patch("python_cloud_server.server.CloudServerConfig.save_to_file"),
-        patch("python_cloud_server.server.MetadataManager", return_value=mock_metadata_manager),
-    ):
-        server = CloudServer(mock_cloud_server_config)
-        server.thumbnail_generator = mock_thumbnail_generator
+    """Provide a CloudServer instance built once and shared by every test in the module.
+
+    The server holds a lock and routes bound to itself, so it cannot be copied per test. `mock_server` restores its
+    directory from the template instead.
+    """
+    server_root = Path(tempfile.mkdtemp(prefix="server", dir=mock_memory_root))
+    shutil.copytree(_mock_server_directory_template, server_root, dirs_exist_ok=True)
+
+    with ExitStack() as stack:
+        # Swap this directly rather than through patch() and restore it on teardown
+        stack.callback(setattr, CloudServerConfig, "save_to_file", CloudServerConfig.save_to_file)
+        CloudServerConfig.save_to_file = lambda self, *args, **kwargs: None
+
+        server = _MockCloudServer(mock_cloud_server_config, server_root)
+        # Override authentication on this app only, leaving the CloudServer class untouched
+        server.app.dependency_overrides[server._verify_api_key] = _fake_verify_api_key
+        stack.callback(server.app.dependency_overrides.clear)
         yield server
 
 
 @pytest.fixture
-def mock_client(mock_server: CloudServer) -> TestClient:
-    """Provide a TestClient for the mock server."""
-    return TestClient(mock_server.app)
+def mock_server(_mock_server_template: CloudServer, _mock_server_directory_template: Path) -> CloudServer:
+    """Provide the shared CloudServer instance, restored so that it only stores the mock file."""
+    server_root = _mock_server_template.server_directory
+    shutil.rmtree(server_root)
+    shutil.copytree(_mock_server_directory_template, server_root)
+    _mock_server_template.metadata_manager._load_metadata()
+    return _mock_server_template
 
 
-def _mock_file_factory(filename: str, content: bytes, content_type: str) -> UploadFile:
-    """Helper to create a mock UploadFile."""
-    file = MagicMock(spec=UploadFile)
-    file.filename = filename
-    file.content_type = content_type
-    bytes_io = BytesIO(content)
+@pytest.fixture(scope="module")
+async def _mock_client_template(_mock_server_template: CloudServer) -> AsyncGenerator[AsyncClient]:
+    """Provide an async client calling the shared server's app in-process, opened once per module."""
+    transport = ASGITransport(app=_mock_server_template.app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+def mock_client(mock_server: CloudServer, _mock_client_template: AsyncClient) -> AsyncClient:
+    """Provide the shared async client, pointed at the freshly reset mock server."""
+    return _mock_client_template
 
-    async def mock_read(size: int = -1) -> bytes:
-        return bytes_io.read(size)
 
-    file.read = mock_read
-    return file
+@pytest.fixture(scope="module")
+def api_route_paths(_mock_server_template: CloudServer) -> frozenset[str]:
+    """Provide the paths of the shared server's API routes."""
+    return frozenset(route.path for route in _mock_server_template.app.routes if isinstance(route, APIRoute))
+
+
+def _mock_file_factory(filename: str, content: bytes, content_type: str) -> UploadFile:
+    """Helper to create an in-memory UploadFile, without the cost of building a spec'd mock."""
+    return UploadFile(
+        file=BytesIO(content),
+        size=len(content),
+        filename=filename,
+        headers=Headers({"content-type": content_type}),
+    )
 
 
 class TestCloudServer:
@@ -115,92 +166,77 @@ class TestCloudServer:
         assert mock_server.metadata_filepath == mock_server.server_directory / "metadata.json"
         assert mock_server.thumbnails_directory == mock_server.storage_directory / ".thumbnails"
 
-    def test_validate_config(self, mock_server: CloudServer, mock_cloud_server_config: CloudServerConfig) -> None:
+    def test_validate_config(self, mock_server: CloudServer, mock_cloud_server_config_dict: dict) -> None:
         """Test configuration validation."""
-        config_dict = mock_cloud_server_config.model_dump()
-        validated_config = mock_server.validate_config(config_dict)
-        assert validated_config == mock_cloud_server_config
+        validated_config = mock_server.validate_config(mock_cloud_server_config_dict)
+        assert validated_config.model_dump() == mock_cloud_server_config_dict
 
     def test_validate_config_invalid_returns_default(self, mock_server: CloudServer) -> None:
         """Test invalid configuration returns default configuration."""
         invalid_config = {"model": None}
         validated_config = mock_server.validate_config(invalid_config)
-        assert isinstance(validated_config, CloudServerConfig)
+        assert type(validated_config) is CloudServerConfig
 
-    def test_setup_routes(self, mock_server: CloudServer) -> None:
-        """Test that routes are set up correctly."""
-        api_routes = [route for route in mock_server.app.routes if isinstance(route, APIRoute)]
-        routes = [route.path for route in api_routes]
-        expected_endpoints = [
+    async def test_lifespan_flushes_metadata_on_shutdown(self, mock_server: CloudServer) -> None:
+        """Test that batched metadata changes are written when the app shuts down."""
+        with patch.object(mock_server.metadata_manager, "close") as mock_close:
+            async with mock_server.app.router.lifespan_context(mock_server.app):
+                mock_close.assert_not_called()
+
+        mock_close.assert_called_once_with()
+
+    @pytest.mark.parametrize(
+        "endpoint",
+        [
             "/health",
             "/login",
             "/files",
             "/files/{filepath:path}",
-        ]
-        for endpoint in expected_endpoints:
-            assert endpoint in routes, f"Expected endpoint {endpoint} not found in routes"
+        ],
+    )
+    def test_setup_routes(self, api_route_paths: frozenset[str], endpoint: str) -> None:
+        """Test that routes are set up correctly."""
+        assert endpoint in api_route_paths, f"Expected endpoint {endpoint} not found in routes"
 
 
 class TestGetFilesEndpoint:
     """Integration and unit tests for the GET /files endpoint."""
 
-    @pytest.fixture
-    def mock_request_object(self) -> Request:
-        """Provide a mock Request object."""
-        return MagicMock(spec=Request)
-
-    def test_get_files(self, mock_server: CloudServer, mock_request_object: Request) -> None:
-        """Test get_files successfully retrieves files."""
-        files_request = GetFilesRequest(tag=None)
-        mock_request_object.json = AsyncMock(return_value=files_request.model_dump())  # type: ignore[method-assign]
-
-        response = asyncio.run(mock_server.get_files(mock_request_object))
-
-        assert isinstance(response, GetFilesResponse)
-        assert response.message == "Retrieved 1 files successfully."
-        assert len(response.files) > 0
-
-    def test_get_files_with_tag_filter(
-        self, mock_server: CloudServer, mock_file_metadata: FileMetadata, mock_request_object: Request
-    ) -> None:
-        """Test get_files filters by tag."""
-        files_request = GetFilesRequest(tag="test")
-        mock_request_object.json = AsyncMock(return_value=files_request.model_dump())  # type: ignore[method-assign]
-
-        response = asyncio.run(mock_server.get_files(mock_request_object))
-
-        assert isinstance(response, GetFilesResponse)
-        assert len(response.files) > 0
-        assert response.files[0].filepath == mock_file_metadata.filepath
-
-    def test_get_files_with_nonexistent_tag(
+    @pytest.mark.parametrize(
+        ("files_request", "expected_filepaths"),
+        [
+            (GetFilesRequest(tag=None).model_dump(), ["test/test.txt"]),
+            (GetFilesRequest(tag="test").model_dump(), ["test/test.txt"]),
+            (GetFilesRequest(tag="nonexistent").model_dump(), []),
+        ],
+    )
+    async def test_get_files(
         self,
         mock_server: CloudServer,
         mock_request_object: Request,
+        monkeypatch: pytest.MonkeyPatch,
+        files_request: dict,
+        expected_filepaths: list[str],
     ) -> None:
-        """Test get_files returns empty list for nonexistent tag."""
-        files_request = GetFilesRequest(tag="nonexistent")
-        mock_request_object.json = AsyncMock(return_value=files_request.model_dump())  # type: ignore[method-assign]
+        """Test get_files retrieves files, optionally filtered by tag."""
+        monkeypatch.setattr(mock_request_object, "json", AsyncMock(return_value=files_request))
 
-        response = asyncio.run(mock_server.get_files(mock_request_object))
+        response = await mock_server.get_files(mock_request_object)
 
         assert isinstance(response, GetFilesResponse)
-        assert len(response.files) == 0
+        assert response.message == f"Retrieved {len(expected_filepaths)} files successfully."
+        assert [file.filepath for file in response.files] == expected_filepaths
 
-    def test_get_files_endpoint(self, mock_client: TestClient) -> None:
+    @pytest.mark.integration
+    async def test_get_files_endpoint(self, mock_client: AsyncClient) -> None:
         """Test GET /files endpoint returns files successfully."""
-        response = mock_client.request("POST", "/files", json={"tag": None, "offset": 0, "limit": 100})
+        response = await mock_client.request("POST", "/files", json={"tag": None, "offset": 0, "limit": 100})
         assert response.status_code == ResponseCode.OK
 
 
 class TestGetFileEndpoint:
     """Integration and unit tests for the GET /files/{filepath} endpoint."""
 
-    @pytest.fixture
-    def mock_request_object(self) -> Request:
-        """Provide a mock Request object."""
-        return MagicMock(spec=Request)
-
     @pytest.fixture
     def mock_file_response(self, mock_server: CloudServer, mock_file_metadata: FileMetadata) -> Generator[FileResponse]:
         """Mock FastAPI FileResponse for file serving."""
@@ -212,7 +248,7 @@ class TestGetFileEndpoint:
         with patch("python_cloud_server.server.FileResponse", return_value=mock_response):
             yield mock_response
 
-    def test_get_file(
+    async def test_get_file(
         self,
         mock_server: CloudServer,
         mock_file_metadata: FileMetadata,
@@ -220,14 +256,14 @@ class TestGetFileEndpoint:
         mock_request_object: Request,
     ) -> None:
         """Test get_file successfully retrieves a file."""
-        response = asyncio.run(mock_server.get_file(mock_request_object, mock_file_metadata.filepath))
+        response = await mock_server.get_file(mock_request_object, mock_file_metadata.filepath)
 
         assert response == mock_file_response
         assert mock_file_response.path == mock_server.storage_directory / mock_file_metadata.filepath
         assert mock_file_response.media_type == mock_file_metadata.mime_type
         assert mock_file_response.filename == Path(mock_file_metadata.filepath).name
 
-    def test_get_file_in_thumbnails_directory(
+    async def test_get_file_in_thumbnails_directory(
         self,
         mock_server: CloudServer,
         mock_request_object: Request,
@@ -238,11 +274,11 @@ class TestGetFileEndpoint:
         with pytest.raises(
             HTTPException, match=rf"Access to thumbnails directory is not allowed: {filepath}"
         ) as exc_info:
-            asyncio.run(mock_server.get_file(mock_request_object, filepath))
+            await mock_server.get_file(mock_request_object, filepath)
 
         assert exc_info.value.status_code == ResponseCode.FORBIDDEN
 
-    def test_get_file_not_found_in_metadata(
+    async def test_get_file_not_found_in_metadata(
         self,
         mock_server: CloudServer,
         mock_request_object: Request,
@@ -251,11 +287,11 @@ class TestGetFileEndpoint:
         filepath = "nonexistent/file.txt"
 
         with pytest.raises(HTTPException, match=rf"File not found in metadata: {filepath}") as exc_info:
-            asyncio.run(mock_server.get_file(mock_request_object, filepath))
+            await mock_server.get_file(mock_request_object, filepath)
 
         assert exc_info.value.status_code == ResponseCode.NOT_FOUND
 
-    def test_get_file_not_found_on_disk(
+    async def test_get_file_not_found_on_disk(
         self,
         mock_server: CloudServer,
         mock_file_metadata: FileMetadata,
@@ -266,15 +302,17 @@ class TestGetFileEndpoint:
         (mock_server.storage_directory / filepath).unlink(missing_ok=True)
 
         with pytest.raises(HTTPException, match=rf"File not found on disk: {filepath}") as exc_info:
-            asyncio.run(mock_server.get_file(mock_request_object, filepath))
+            await mock_server.get_file(mock_request_object, filepath)
 
         assert exc_info.value.status_code == ResponseCode.NOT_FOUND
 
-    def test_get_file_endpoint(self, mock_client: TestClient, mock_file_metadata: FileMetadata) -> None:
+    @pytest.mark.integration
+    async def test_get_file_endpoint(self, mock_client: AsyncClient, mock_file_metadata: FileMetadata) -> None:
         """Test GET /files/{filepath} endpoint returns file successfully."""
-        response = mock_client.get(f"/files/{mock_file_metadata.filepath}")
+        response = await mock_client.get(f"/files/{mock_file_metadata.filepath}")
         assert response.status_code == ResponseCode.OK
         assert response.content == b"test content"
+        assert response.headers["content-length"] == str(len(b"test content"))
 
 
 class TestPostFileEndpoint:
@@ -285,16 +323,11 @@ class TestPostFileEndpoint:
     MOCK_CONTENT = b"test file content"
     MOCK_CONTENT_TYPE = "text/plain"
 
-    @pytest.fixture
-    def mock_request_object(self) -> Request:
-        """Provide a mock Request object."""
-        return MagicMock(spec=Request)
-
-    def test_post_file(self, mock_server: CloudServer, mock_request_object: Request) -> None:
+    async def test_post_file(self, mock_server: CloudServer, mock_request_object: Request) -> None:
         """Test post_file successfully uploads a file."""
         mock_file = _mock_file_factory(self.MOCK_FILENAME, self.MOCK_CONTENT, self.MOCK_CONTENT_TYPE)
 
-        response = asyncio.run(mock_server.post_file(mock_request_object, self.MOCK_FILEPATH, mock_file))
+        response = await mock_server.post_file(mock_request_object, self.MOCK_FILEPATH, mock_file)
 
         assert isinstance(response, PostFileResponse)
         assert response.filepath == self.MOCK_FILEPATH
@@ -313,44 +346,95 @@ class TestPostFileEndpoint:
         assert metadata.size == len(self.MOCK_CONTENT)
         assert metadata.mime_type == self.MOCK_CONTENT_TYPE
 
-    def test_post_file_duplicate(self, mock_server: CloudServer, mock_request_object: Request) -> None:
+    async def test_post_file_without_anonymous_files(
+        self, mock_server: CloudServer, mock_request_object: Request
+    ) -> None:
+        """Test post_file writes straight to the destination where anonymous files are unsupported."""
+        mock_file = _mock_file_factory(self.MOCK_FILENAME, self.MOCK_CONTENT, self.MOCK_CONTENT_TYPE)
+
+        with patch("python_cloud_server.server._SUPPORTS_ANONYMOUS_FILES", new=False):
+            response = await mock_server.post_file(mock_request_object, self.MOCK_FILEPATH, mock_file)
+
+        assert response.size == len(self.MOCK_CONTENT)
+        assert (mock_server.storage_directory / self.MOCK_FILEPATH).read_bytes() == self.MOCK_CONTENT
+
+    async def test_post_file_replaces_untracked_file(
+        self, mock_server: CloudServer, mock_request_object: Request
+    ) -> None:
+        """Test post_file replaces a file on disk which is not tracked in the metadata."""
+        full_path = mock_server.storage_directory / self.MOCK_FILEPATH
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+        full_path.write_bytes(b"stale content")
+        mock_file = _mock_file_factory(self.MOCK_FILENAME, self.MOCK_CONTENT, self.MOCK_CONTENT_TYPE)
+
+        await mock_server.post_file(mock_request_object, self.MOCK_FILEPATH, mock_file)
+
+        assert full_path.read_bytes() == self.MOCK_CONTENT
+
+    async def test_post_file_duplicate(self, mock_server: CloudServer, mock_request_object: Request) -> None:
         """Test post_file returns conflict when file already exists."""
         mock_file = _mock_file_factory(self.MOCK_FILENAME, self.MOCK_CONTENT, self.MOCK_CONTENT_TYPE)
 
-        asyncio.run(mock_server.post_file(mock_request_object, self.MOCK_FILEPATH, mock_file))
+        await mock_server.post_file(mock_request_object, self.MOCK_FILEPATH, mock_file)
 
         # Try to upload again
         with pytest.raises(HTTPException, match=rf"File already exists: {self.MOCK_FILEPATH}") as exc_info:
-            asyncio.run(mock_server.post_file(mock_request_object, self.MOCK_FILEPATH, mock_file))
+            await mock_server.post_file(mock_request_object, self.MOCK_FILEPATH, mock_file)
 
         assert exc_info.value.status_code == ResponseCode.CONFLICT
 
-    def test_post_file_guess_mime_type(self, mock_server: CloudServer, mock_request_object: Request) -> None:
+    async def test_post_file_guess_mime_type(self, mock_server: CloudServer, mock_request_object: Request) -> None:
         """Test post_file guesses MIME type when not provided."""
         filepath = "uploads/image.png"
         mock_file = _mock_file_factory("image.png", b"\x89PNG\r\n\x1a\n", "application/octet-stream")
 
-        asyncio.run(mock_server.post_file(mock_request_object, filepath, mock_file))
+        await mock_server.post_file(mock_request_object, filepath, mock_file)
 
         metadata = mock_server.metadata_manager.get_file_entry(filepath)
         assert isinstance(metadata, FileMetadata)
         assert metadata.mime_type == "image/png"
 
-    def test_post_file_exceeds_size_limit(self, mock_server: CloudServer, mock_request_object: Request) -> None:
+    async def test_post_file_exceeds_size_limit(
+        self, mock_server: CloudServer, mock_request_object: Request, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
         """Test post_file returns error when file exceeds size limit."""
+        monkeypatch.setattr(mock_server.config.storage_config, "max_file_size_mb", 1)
         max_size = mock_server.config.storage_config.max_file_size_mb * MB_TO_BYTES
         large_content = b"X" * (max_size + 1000)
         mock_file = _mock_file_factory(self.MOCK_FILENAME, large_content, "application/octet-stream")
 
         with pytest.raises(HTTPException, match=rf"Failed to save file: {self.MOCK_FILEPATH}") as exc_info:
-            asyncio.run(mock_server.post_file(mock_request_object, self.MOCK_FILEPATH, mock_file))
+            await mock_server.post_file(mock_request_object, self.MOCK_FILEPATH, mock_file)
 
         assert exc_info.value.status_code == ResponseCode.INTERNAL_SERVER_ERROR
+        assert isinstance(exc_info.value.__cause__, ValueError)
+        assert "exceeds maximum limit" in str(exc_info.value.__cause__)
 
         # Verify no metadata entry
         assert mock_server.metadata_manager.get_file_entry(self.MOCK_FILEPATH) is None
 
-    def test_post_file_metadata_error_cleanup(self, mock_server: CloudServer, mock_request_object: Request) -> None:
+    async def test_post_file_exceeds_size_limit_unknown_size(
+        self, mock_server: CloudServer, mock_request_object: Request, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test post_file stops writing once an upload without a declared size exceeds the size limit."""
+        monkeypatch.setattr(mock_server.config.storage_config, "max_file_size_mb", 1)
+        max_size = mock_server.config.storage_config.max_file_size_mb * MB_TO_BYTES
+        large_content = b"X" * (max_size + 1000)
+        mock_file = _mock_file_factory(self.MOCK_FILENAME, large_content, "application/octet-stream")
+        mock_file.size = None
+
+        with pytest.raises(HTTPException, match=rf"Failed to save file: {self.MOCK_FILEPATH}") as exc_info:
+            await mock_server.post_file(mock_request_object, self.MOCK_FILEPATH, mock_file)
+
+        assert exc_info.value.status_code == ResponseCode.INTERNAL_SERVER_ERROR
+        assert isinstance(exc_info.value.__cause__, ValueError)
+        assert "exceeds maximum limit" in str(exc_info.value.__cause__)
+        assert not (mock_server.storage_directory / self.MOCK_FILEPATH).exists()
+        assert mock_server.metadata_manager.get_file_entry(self.MOCK_FILEPATH) is None
+
+    async def test_post_file_metadata_error_cleanup(
+        self, mock_server: CloudServer, mock_request_object: Request
+    ) -> None:
         """Test post_file cleans up file when metadata save fails."""
         mock_file = _mock_file_factory(self.MOCK_FILENAME, self.MOCK_CONTENT, self.MOCK_CONTENT_TYPE)
 
@@ -359,7 +443,7 @@ class TestPostFileEndpoint:
             patch.object(mock_server.metadata_manager, "add_file_entries", side_effect=Exception("Metadata error")),
             pytest.raises(HTTPException, match=rf"Failed to save metadata for file: {self.MOCK_FILEPATH}") as exc_info,
         ):
-            asyncio.run(mock_server.post_file(mock_request_object, self.MOCK_FILEPATH, mock_file))
+            await mock_server.post_file(mock_request_object, self.MOCK_FILEPATH, mock_file)
 
         assert exc_info.value.status_code == ResponseCode.INTERNAL_SERVER_ERROR
 
@@ -367,13 +451,14 @@ class TestPostFileEndpoint:
         full_path = mock_server.storage_directory / self.MOCK_FILEPATH
         assert not full_path.exists()
 
-    def test_post_file_endpoint(self, mock_client: TestClient) -> None:
-        """Test POST /files/{filepath} endpoint via TestClient."""
+    @pytest.mark.integration
+    async def test_post_file_endpoint(self, mock_client: AsyncClient) -> None:
+        """Test POST /files/{filepath} endpoint via the async client."""
         mock_file = _mock_file_factory(self.MOCK_FILENAME, self.MOCK_CONTENT, self.MOCK_CONTENT_TYPE)
 
-        response = mock_client.post(
+        response = await mock_client.post(
             f"/files/{self.MOCK_FILEPATH}",
-            files={"file": (mock_file.filename, BytesIO(self.MOCK_CONTENT), mock_file.content_type)},
+            files={"file": (mock_file.filename, self.MOCK_CONTENT, mock_file.content_type)},
         )
 
         assert response.status_code == ResponseCode.OK
@@ -386,46 +471,64 @@ class TestPatchFileEndpoint:
     MOCK_FILEPATH = f"uploads/{MOCK_FILENAME}"
     MOCK_CONTENT = b"patch me"
     MOCK_CONTENT_TYPE = "text/plain"
+    MOCK_MOVED_FILEPATH = "uploads/moved.txt"
+    MOCK_EXISTING_FILEPATH = "test/test.txt"
+
+    MOCK_ADD_TAGS_REQUEST = PatchFileRequest(add_tags=["new_tag"], remove_tags=[]).model_dump()
+    MOCK_REMOVE_TAGS_REQUEST = PatchFileRequest(add_tags=[], remove_tags=["test"]).model_dump()
+    MOCK_MOVE_REQUEST = PatchFileRequest(new_filepath=MOCK_MOVED_FILEPATH, add_tags=[], remove_tags=[]).model_dump()
+    MOCK_MOVE_TO_EXISTING_REQUEST = PatchFileRequest(
+        new_filepath=MOCK_EXISTING_FILEPATH, add_tags=[], remove_tags=[]
+    ).model_dump()
+    MOCK_TAG_LIMIT_REQUEST = PatchFileRequest(add_tags=list(_TAG_BATCH), remove_tags=[]).model_dump()
+    MOCK_LONG_TAG_REQUEST = PatchFileRequest(add_tags=[_LONG_TAG, "valid_tag"], remove_tags=[]).model_dump()
 
     @pytest.fixture
-    def mock_request_object(self) -> Request:
-        """Provide a mock Request object."""
-        return MagicMock(spec=Request)
+    async def mock_uploaded_file(self, mock_server: CloudServer, mock_request_object: Request) -> str:
+        """Upload the class's mock file to the server and provide its filepath."""
+        mock_file = _mock_file_factory(self.MOCK_FILENAME, self.MOCK_CONTENT, self.MOCK_CONTENT_TYPE)
+        await mock_server.post_file(mock_request_object, self.MOCK_FILEPATH, mock_file)
+        return self.MOCK_FILEPATH
 
-    def test_patch_file_add_tags(self, mock_server: CloudServer, mock_request_object: Request) -> None:
+    @pytest.mark.usefixtures("mock_uploaded_file")
+    async def test_patch_file_add_tags(
+        self,
+        mock_server: CloudServer,
+        mock_request_object: Request,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
         """Test patch_file successfully adds tags."""
-        patch_request = PatchFileRequest(add_tags=["new_tag"], remove_tags=[])
-        mock_request_object.json = AsyncMock(return_value=patch_request.model_dump())  # type: ignore[method-assign]
+        monkeypatch.setattr(mock_request_object, "json", AsyncMock(return_value=self.MOCK_ADD_TAGS_REQUEST))
 
-        mock_file = _mock_file_factory(self.MOCK_FILENAME, self.MOCK_CONTENT, self.MOCK_CONTENT_TYPE)
-        asyncio.run(mock_server.post_file(mock_request_object, self.MOCK_FILEPATH, mock_file))
-
-        response = asyncio.run(mock_server.patch_file(mock_request_object, self.MOCK_FILEPATH))
+        response = await mock_server.patch_file(mock_request_object, self.MOCK_FILEPATH)
 
         assert isinstance(response, PatchFileResponse)
         assert response.filepath == self.MOCK_FILEPATH
         assert "new_tag" in response.tags
 
-    def test_patch_file_remove_tags(self, mock_server: CloudServer, mock_request_object: Request) -> None:
+    async def test_patch_file_remove_tags(
+        self, mock_server: CloudServer, mock_request_object: Request, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
         """Test patch_file successfully removes tags."""
-        patch_request = PatchFileRequest(add_tags=[], remove_tags=["test"])
-        mock_request_object.json = AsyncMock(return_value=patch_request.model_dump())  # type: ignore[method-assign]
+        monkeypatch.setattr(mock_request_object, "json", AsyncMock(return_value=self.MOCK_REMOVE_TAGS_REQUEST))
 
-        response = asyncio.run(mock_server.patch_file(mock_request_object, "test/test.txt"))
+        response = await mock_server.patch_file(mock_request_object, "test/test.txt")
 
         assert isinstance(response, PatchFileResponse)
         assert "test" not in response.tags
 
-    def test_patch_file_move_file(self, mock_server: CloudServer, mock_request_object: Request) -> None:
+    @pytest.mark.usefixtures("mock_uploaded_file")
+    async def test_patch_file_move_file(
+        self,
+        mock_server: CloudServer,
+        mock_request_object: Request,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
         """Test patch_file successfully moves/renames file."""
-        new_filepath = "uploads/moved.txt"
-        patch_request = PatchFileRequest(new_filepath=new_filepath, add_tags=[], remove_tags=[])
-        mock_request_object.json = AsyncMock(return_value=patch_request.model_dump())  # type: ignore[method-assign]
+        new_filepath = self.MOCK_MOVED_FILEPATH
+        monkeypatch.setattr(mock_request_object, "json", AsyncMock(return_value=self.MOCK_MOVE_REQUEST))
 
-        mock_file = _mock_file_factory(self.MOCK_FILENAME, self.MOCK_CONTENT, self.MOCK_CONTENT_TYPE)
-        asyncio.run(mock_server.post_file(mock_request_object, self.MOCK_FILEPATH, mock_file))
-
-        response = asyncio.run(mock_server.patch_file(mock_request_object, self.MOCK_FILEPATH))
+        response = await mock_server.patch_file(mock_request_object, self.MOCK_FILEPATH)
 
         assert isinstance(response, PatchFileResponse)
         assert response.filepath == new_filepath
@@ -435,89 +538,90 @@ class TestPatchFileEndpoint:
         assert not old_path.exists()
         assert new_path.exists()
 
-    def test_patch_file_not_found(self, mock_server: CloudServer, mock_request_object: Request) -> None:
+    async def test_patch_file_not_found(
+        self, mock_server: CloudServer, mock_request_object: Request, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
         """Test patch_file returns error when file doesn't exist."""
-        patch_request = PatchFileRequest(add_tags=["tag"], remove_tags=[])
-        mock_request_object.json = AsyncMock(return_value=patch_request.model_dump())  # type: ignore[method-assign]
+        monkeypatch.setattr(mock_request_object, "json", AsyncMock(return_value=self.MOCK_ADD_TAGS_REQUEST))
         filepath = "nonexistent/file.txt"
 
         with pytest.raises(HTTPException, match=rf"File not found in metadata: {filepath}") as exc_info:
-            asyncio.run(mock_server.patch_file(mock_request_object, filepath))
+            await mock_server.patch_file(mock_request_object, filepath)
 
         assert exc_info.value.status_code == ResponseCode.NOT_FOUND
 
-    def test_patch_file_destination_exists(self, mock_server: CloudServer, mock_request_object: Request) -> None:
+    @pytest.mark.usefixtures("mock_uploaded_file")
+    async def test_patch_file_destination_exists(
+        self,
+        mock_server: CloudServer,
+        mock_request_object: Request,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
         """Test patch_file returns conflict when destination exists."""
-        new_filepath = "test/test.txt"
-        patch_request = PatchFileRequest(new_filepath=new_filepath, add_tags=[], remove_tags=[])
-
-        mock_request_object.json = AsyncMock(return_value=patch_request.model_dump())  # type: ignore[method-assign]
-
-        mock_file = _mock_file_factory(self.MOCK_FILENAME, self.MOCK_CONTENT, self.MOCK_CONTENT_TYPE)
-        asyncio.run(mock_server.post_file(mock_request_object, self.MOCK_FILEPATH, mock_file))
+        new_filepath = self.MOCK_EXISTING_FILEPATH
+        monkeypatch.setattr(mock_request_object, "json", AsyncMock(return_value=self.MOCK_MOVE_TO_EXISTING_REQUEST))
 
         with pytest.raises(HTTPException, match=rf"Destination file already exists: {new_filepath}") as exc_info:
-            asyncio.run(mock_server.patch_file(mock_request_object, self.MOCK_FILEPATH))
+            await mock_server.patch_file(mock_request_object, self.MOCK_FILEPATH)
 
         assert exc_info.value.status_code == ResponseCode.CONFLICT
 
-    def test_patch_file_tag_limit_exceeded(self, mock_server: CloudServer, mock_request_object: Request) -> None:
+    async def test_patch_file_tag_limit_exceeded(
+        self, mock_server: CloudServer, mock_request_object: Request, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
         """Test patch_file returns error when tag limit exceeded."""
         # Add more tags than allowed
-        max_tags = mock_server.config.storage_config.max_tags_per_file
-        add_tags = [f"tag{i}" for i in range(max_tags)]
-        patch_request = PatchFileRequest(add_tags=add_tags, remove_tags=[])
-        mock_request_object.json = AsyncMock(return_value=patch_request.model_dump())  # type: ignore[method-assign]
+        monkeypatch.setattr(mock_request_object, "json", AsyncMock(return_value=self.MOCK_TAG_LIMIT_REQUEST))
 
         with pytest.raises(
-            HTTPException, match=rf"Number of tags exceeds maximum: {len(add_tags) + 1} > {max_tags}"
+            HTTPException, match=rf"Number of tags exceeds maximum: {_MAX_TAGS + 1} > {_MAX_TAGS}"
         ) as exc_info:
-            asyncio.run(mock_server.patch_file(mock_request_object, "test/test.txt"))
+            await mock_server.patch_file(mock_request_object, "test/test.txt")
 
         assert exc_info.value.status_code == ResponseCode.BAD_REQUEST
 
-    def test_patch_file_tag_too_long(self, mock_server: CloudServer, mock_request_object: Request) -> None:
+    async def test_patch_file_tag_too_long(
+        self, mock_server: CloudServer, mock_request_object: Request, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
         """Test patch_file skips tags that are too long."""
-        max_length = mock_server.config.storage_config.max_tag_length
-        long_tag = "a" * (max_length + 1)
-        patch_request = PatchFileRequest(add_tags=[long_tag, "valid_tag"], remove_tags=[])
-        mock_request_object.json = AsyncMock(return_value=patch_request.model_dump())  # type: ignore[method-assign]
+        monkeypatch.setattr(mock_request_object, "json", AsyncMock(return_value=self.MOCK_LONG_TAG_REQUEST))
 
-        response = asyncio.run(mock_server.patch_file(mock_request_object, "test/test.txt"))
+        response = await mock_server.patch_file(mock_request_object, "test/test.txt")
 
         assert isinstance(response, PatchFileResponse)
         assert "valid_tag" in response.tags
-        assert long_tag not in response.tags
+        assert _LONG_TAG not in response.tags
 
-    def test_patch_file_move_error(
-        self, mock_server: CloudServer, mock_request_object: Request, mock_rename_file: MagicMock
+    @pytest.mark.usefixtures("mock_uploaded_file")
+    async def test_patch_file_move_error(
+        self,
+        mock_server: CloudServer,
+        mock_request_object: Request,
+        monkeypatch: pytest.MonkeyPatch,
+        mock_rename_file: MagicMock,
     ) -> None:
         """Test patch_file returns error when file move fails."""
-        new_filepath = "uploads/moved.txt"
-        patch_request = PatchFileRequest(new_filepath=new_filepath, add_tags=[], remove_tags=[])
-        mock_request_object.json = AsyncMock(return_value=patch_request.model_dump())  # type: ignore[method-assign]
-
-        mock_file = _mock_file_factory(self.MOCK_FILENAME, self.MOCK_CONTENT, self.MOCK_CONTENT_TYPE)
-        asyncio.run(mock_server.post_file(mock_request_object, self.MOCK_FILEPATH, mock_file))
+        new_filepath = self.MOCK_MOVED_FILEPATH
+        monkeypatch.setattr(mock_request_object, "json", AsyncMock(return_value=self.MOCK_MOVE_REQUEST))
 
         mock_rename_file.side_effect = Exception("Rename failed")
         with pytest.raises(
             HTTPException, match=rf"Failed to move file from {self.MOCK_FILEPATH} to {new_filepath}"
         ) as exc_info:
-            asyncio.run(mock_server.patch_file(mock_request_object, self.MOCK_FILEPATH))
+            await mock_server.patch_file(mock_request_object, self.MOCK_FILEPATH)
 
         assert exc_info.value.status_code == ResponseCode.INTERNAL_SERVER_ERROR
 
-    def test_patch_file_metadata_update_failure_rollback(
-        self, mock_server: CloudServer, mock_request_object: Request
+    @pytest.mark.usefixtures("mock_uploaded_file")
+    async def test_patch_file_metadata_update_failure_rollback(
+        self,
+        mock_server: CloudServer,
+        mock_request_object: Request,
+        monkeypatch: pytest.MonkeyPatch,
     ) -> None:
         """Test patch_file rolls back file move when metadata update fails."""
-        new_filepath = "uploads/moved.txt"
-        patch_request = PatchFileRequest(new_filepath=new_filepath, add_tags=[], remove_tags=[])
-        mock_request_object.json = AsyncMock(return_value=patch_request.model_dump())  # type: ignore[method-assign]
-
-        mock_file = _mock_file_factory(self.MOCK_FILENAME, self.MOCK_CONTENT, self.MOCK_CONTENT_TYPE)
-        asyncio.run(mock_server.post_file(mock_request_object, self.MOCK_FILEPATH, mock_file))
+        new_filepath = self.MOCK_MOVED_FILEPATH
+        monkeypatch.setattr(mock_request_object, "json", AsyncMock(return_value=self.MOCK_MOVE_REQUEST))
 
         with (
             patch.object(
@@ -527,7 +631,7 @@ class TestPatchFileEndpoint:
                 HTTPException, match=rf"Failed to update metadata for file: {self.MOCK_FILEPATH}"
             ) as exc_info,
         ):
-            asyncio.run(mock_server.patch_file(mock_request_object, self.MOCK_FILEPATH))
+            await mock_server.patch_file(mock_request_object, self.MOCK_FILEPATH)
 
         assert exc_info.value.status_code == ResponseCode.INTERNAL_SERVER_ERROR
 
@@ -540,18 +644,11 @@ class TestPatchFileEndpoint:
         assert metadata is not None
         assert metadata.filepath == self.MOCK_FILEPATH
 
-    def test_patch_file_endpoint(self, mock_client: TestClient) -> None:
-        """Test PATCH /files/{filepath} endpoint via TestClient."""
-        # First upload a file
-        mock_file = _mock_file_factory(self.MOCK_FILENAME, self.MOCK_CONTENT, self.MOCK_CONTENT_TYPE)
-        mock_client.post(
-            f"/files/{self.MOCK_FILEPATH}",
-            files={"file": (mock_file.filename, BytesIO(self.MOCK_CONTENT), mock_file.content_type)},
-        )
-
-        # Patch the file
+    @pytest.mark.integration
+    async def test_patch_file_endpoint(self, mock_client: AsyncClient, mock_uploaded_file: str) -> None:
+        """Test PATCH /files/{filepath} endpoint via the async client."""
         patch_data = {"add_tags": ["new_tag"], "remove_tags": []}
-        response = mock_client.patch(f"/files/{self.MOCK_FILEPATH}", json=patch_data)
+        response = await mock_client.patch(f"/files/{mock_uploaded_file}", json=patch_data)
 
         assert response.status_code == ResponseCode.OK
 
@@ -565,20 +662,20 @@ class TestDeleteFileEndpoint:
     MOCK_CONTENT_TYPE = "text/plain"
 
     @pytest.fixture
-    def mock_request_object(self) -> Request:
-        """Provide a mock Request object."""
-        return MagicMock(spec=Request)
-
-    def test_delete_file_success(self, mock_server: CloudServer, mock_request_object: Request) -> None:
-        """Test delete_file successfully deletes a file."""
+    async def mock_uploaded_file(self, mock_server: CloudServer, mock_request_object: Request) -> str:
+        """Upload the class's mock file to the server and provide its filepath."""
         mock_file = _mock_file_factory(self.MOCK_FILENAME, self.MOCK_CONTENT, self.MOCK_CONTENT_TYPE)
-        asyncio.run(mock_server.post_file(mock_request_object, self.MOCK_FILEPATH, mock_file))
+        await mock_server.post_file(mock_request_object, self.MOCK_FILEPATH, mock_file)
+        return self.MOCK_FILEPATH
 
+    @pytest.mark.usefixtures("mock_uploaded_file")
+    async def test_delete_file_success(self, mock_server: CloudServer, mock_request_object: Request) -> None:
+        """Test delete_file successfully deletes a file."""
         full_path = mock_server.storage_directory / self.MOCK_FILEPATH
         assert full_path.exists()
         assert mock_server.metadata_manager.get_file_entry(self.MOCK_FILEPATH) is not None
 
-        response = asyncio.run(mock_server.delete_file(mock_request_object, self.MOCK_FILEPATH))
+        response = await mock_server.delete_file(mock_request_object, self.MOCK_FILEPATH)
 
         assert isinstance(response, DeleteFileResponse)
         assert response.filepath == self.MOCK_FILEPATH
@@ -587,20 +684,18 @@ class TestDeleteFileEndpoint:
         assert not full_path.exists()
         assert mock_server.metadata_manager.get_file_entry(self.MOCK_FILEPATH) is None
 
-    def test_delete_file_not_found(self, mock_server: CloudServer, mock_request_object: Request) -> None:
+    async def test_delete_file_not_found(self, mock_server: CloudServer, mock_request_object: Request) -> None:
         """Test delete_file returns error when file doesn't exist."""
         filepath = "nonexistent/file.txt"
 
         with pytest.raises(HTTPException, match=rf"File not found in metadata: {filepath}") as exc_info:
-            asyncio.run(mock_server.delete_file(mock_request_object, filepath))
+            await mock_server.delete_file(mock_request_object, filepath)
 
         assert exc_info.value.status_code == ResponseCode.NOT_FOUND
 
-    def test_delete_file_metadata_error(self, mock_server: CloudServer, mock_request_object: Request) -> None:
+    @pytest.mark.usefixtures("mock_uploaded_file")
+    async def test_delete_file_metadata_error(self, mock_server: CloudServer, mock_request_object: Request) -> None:
         """Test delete_file returns error when metadata deletion fails."""
-        mock_file = _mock_file_factory(self.MOCK_FILENAME, self.MOCK_CONTENT, self.MOCK_CONTENT_TYPE)
-        asyncio.run(mock_server.post_file(mock_request_object, self.MOCK_FILEPATH, mock_file))
-
         with (
             patch.object(
                 mock_server.metadata_manager, "delete_file_entries", side_effect=Exception("Metadata deletion error")
@@ -609,39 +704,38 @@ class TestDeleteFileEndpoint:
                 HTTPException, match=rf"Failed to delete metadata for file: {self.MOCK_FILEPATH}"
             ) as exc_info,
         ):
-            asyncio.run(mock_server.delete_file(mock_request_object, self.MOCK_FILEPATH))
+            await mock_server.delete_file(mock_request_object, self.MOCK_FILEPATH)
 
         assert exc_info.value.status_code == ResponseCode.INTERNAL_SERVER_ERROR
 
-    def test_delete_file_disk_error(self, mock_server: CloudServer, mock_request_object: Request) -> None:
+    @pytest.mark.usefixtures("mock_uploaded_file")
+    async def test_delete_file_disk_error(self, mock_server: CloudServer, mock_request_object: Request) -> None:
         """Test delete_file returns error when file deletion from disk fails."""
-        mock_file = _mock_file_factory(self.MOCK_FILENAME, self.MOCK_CONTENT, self.MOCK_CONTENT_TYPE)
-        asyncio.run(mock_server.post_file(mock_request_object, self.MOCK_FILEPATH, mock_file))
+        full_path = mock_server.storage_directory / self.MOCK_FILEPATH
+        unlink = Path.unlink
+
+        def mock_unlink(path: Path, *args: bool, **kwargs: bool) -> None:
+            # Only fail for the file being deleted so other unlinks in the test behave normally
+            if path == full_path:
+                msg = "Disk error"
+                raise OSError(msg)
+            unlink(path, *args, **kwargs)
 
         with (
-            patch.object(Path, "unlink", side_effect=Exception("Disk error")),
+            patch.object(Path, "unlink", autospec=True, side_effect=mock_unlink),
             pytest.raises(HTTPException, match=rf"Failed to delete file from disk: {self.MOCK_FILEPATH}") as exc_info,
         ):
-            asyncio.run(mock_server.delete_file(mock_request_object, self.MOCK_FILEPATH))
+            await mock_server.delete_file(mock_request_object, self.MOCK_FILEPATH)
 
         assert exc_info.value.status_code == ResponseCode.INTERNAL_SERVER_ERROR
 
-        full_path = mock_server.storage_directory / self.MOCK_FILEPATH
         assert full_path.exists()
         assert mock_server.metadata_manager.get_file_entry(self.MOCK_FILEPATH) is not None
 
-    def test_delete_file_endpoint(self, mock_client: TestClient) -> None:
-        """Test DELETE /files/{filepath} endpoint via TestClient."""
-        mock_file = _mock_file_factory(self.MOCK_FILENAME, self.MOCK_CONTENT, self.MOCK_CONTENT_TYPE)
-
-        # First upload a file
-        mock_client.post(
-            f"/files/{self.MOCK_FILEPATH}",
-            files={"file": (mock_file.filename, BytesIO(self.MOCK_CONTENT), mock_file.content_type)},
-        )
-
-        # Delete the file
-        response = mock_client.delete(f"/files/{self.MOCK_FILEPATH}")
+    @pytest.mark.integration
+    async def test_delete_file_endpoint(self, mock_client: AsyncClient, mock_uploaded_file: str) -> None:
+        """Test DELETE /files/{filepath} endpoint via the async client."""
+        response = await mock_client.delete(f"/files/{mock_uploaded_file}")
         assert response.status_code == ResponseCode.OK
 
 
@@ -651,11 +745,6 @@ class TestGetThumbnailEndpoint:
     MOCK_FILEPATH = "images/test.jpg"
     MOCK_FILENAME = "test.jpg"
 
-    @pytest.fixture
-    def mock_request_object(self) -> Request:
-        """Provide a mock Request object."""
-        return MagicMock(spec=Request)
-
     @pytest.fixture
     def mock_image_metadata(self) -> FileMetadata:
         """Provide mock image metadata."""
@@ -666,7 +755,7 @@ class TestGetThumbnailEndpoint:
             tags=["test"],
         )
 
-    def test_get_thumbnail_success(
+    async def test_get_thumbnail_success(
         self, mock_server: CloudServer, mock_request_object: Request, mock_image_metadata: FileMetadata
     ) -> None:
         """Test get_thumbnail returns thumbnail successfully."""
@@ -683,12 +772,12 @@ class TestGetThumbnailEndpoint:
         thumbnail_path.parent.mkdir(parents=True, exist_ok=True)
         thumbnail_path.write_bytes(b"fake thumbnail data")
 
-        response = asyncio.run(mock_server.get_thumbnail(mock_request_object, self.MOCK_FILEPATH))
+        response = await mock_server.get_thumbnail(mock_request_object, self.MOCK_FILEPATH)
 
         assert response.path == thumbnail_path
         assert response.media_type == "image/jpeg"
 
-    def test_get_thumbnail_generates_on_demand(
+    async def test_get_thumbnail_generates_on_demand(
         self, mock_server: CloudServer, mock_request_object: Request, mock_image_metadata: FileMetadata
     ) -> None:
         """Test get_thumbnail generates thumbnail on demand if it doesn't exist."""
@@ -708,7 +797,6 @@ class TestGetThumbnailEndpoint:
         with patch("python_cloud_server.thumbnails.Image") as mock_image:
             mock_img_instance = MagicMock(autospec=True)
             mock_img_instance.mode = "RGB"
-            mock_img_instance.copy.return_value = mock_img_instance
             mock_image.open.return_value.__enter__.return_value = mock_img_instance
 
             def mock_thumbnail_save(path: str | Path, img_format: str = "JPEG", **kwargs: dict) -> None:
@@ -718,19 +806,44 @@ class TestGetThumbnailEndpoint:
 
             mock_img_instance.save.side_effect = mock_thumbnail_save
 
-            response = asyncio.run(mock_server.get_thumbnail(mock_request_object, self.MOCK_FILEPATH))
+            response = await mock_server.get_thumbnail(mock_request_object, self.MOCK_FILEPATH)
 
             assert response.path == thumbnail_path
             assert thumbnail_path.exists()
 
-    def test_get_thumbnail_file_not_in_metadata(self, mock_server: CloudServer, mock_request_object: Request) -> None:
+    async def test_get_thumbnail_concurrent_requests(
+        self, mock_server: CloudServer, mock_request_object: Request, mock_image_metadata: FileMetadata
+    ) -> None:
+        """Test concurrent requests for a missing thumbnail are all served a complete thumbnail."""
+        mock_server.metadata_manager.add_file_entries([mock_image_metadata])
+
+        source_file = mock_server.storage_directory / self.MOCK_FILEPATH
+        source_file.parent.mkdir(parents=True, exist_ok=True)
+        Image.new("RGB", (640, 480), color=(255, 0, 0)).save(source_file, "JPEG")
+
+        thumbnail_path = mock_server.thumbnails_directory / f"{self.MOCK_FILEPATH}.jpg"
+        responses = await asyncio.gather(
+            mock_server.get_thumbnail(mock_request_object, self.MOCK_FILEPATH),
+            mock_server.get_thumbnail(mock_request_object, self.MOCK_FILEPATH),
+        )
+
+        assert [response.path for response in responses] == [thumbnail_path, thumbnail_path]
+        with Image.open(thumbnail_path) as img:
+            img.verify()
+        assert not list(thumbnail_path.parent.glob("*.tmp"))
+
+    async def test_get_thumbnail_file_not_in_metadata(
+        self, mock_server: CloudServer, mock_request_object: Request
+    ) -> None:
         """Test get_thumbnail raises error if file not in metadata."""
         with pytest.raises(HTTPException, match="File not found in metadata") as exc_info:
-            asyncio.run(mock_server.get_thumbnail(mock_request_object, "nonexistent.jpg"))
+            await mock_server.get_thumbnail(mock_request_object, "nonexistent.jpg")
 
         assert exc_info.value.status_code == ResponseCode.NOT_FOUND
 
-    def test_get_thumbnail_not_image_or_video(self, mock_server: CloudServer, mock_request_object: Request) -> None:
+    async def test_get_thumbnail_not_image_or_video(
+        self, mock_server: CloudServer, mock_request_object: Request
+    ) -> None:
         """Test get_thumbnail raises error for non-image/video files."""
         text_metadata = FileMetadata.new_current_instance(
             filepath="test.txt",
@@ -741,11 +854,11 @@ class TestGetThumbnailEndpoint:
         mock_server.metadata_manager.add_file_entries([text_metadata])
 
         with pytest.raises(HTTPException, match="Thumbnails only available for images and videos") as exc_info:
-            asyncio.run(mock_server.get_thumbnail(mock_request_object, "test.txt"))
+            await mock_server.get_thumbnail(mock_request_object, "test.txt")
 
         assert exc_info.value.status_code == ResponseCode.BAD_REQUEST
 
-    def test_get_thumbnail_source_file_not_found(
+    async def test_get_thumbnail_source_file_not_found(
         self, mock_server: CloudServer, mock_request_object: Request, mock_image_metadata: FileMetadata
     ) -> None:
         """Test get_thumbnail raises error if source file doesn't exist on disk."""
@@ -753,14 +866,15 @@ class TestGetThumbnailEndpoint:
         mock_server.metadata_manager.add_file_entries([mock_image_metadata])
 
         with pytest.raises(HTTPException, match="Source file not found on disk") as exc_info:
-            asyncio.run(mock_server.get_thumbnail(mock_request_object, self.MOCK_FILEPATH))
+            await mock_server.get_thumbnail(mock_request_object, self.MOCK_FILEPATH)
 
         assert exc_info.value.status_code == ResponseCode.NOT_FOUND
 
-    def test_get_thumbnail_endpoint(
-        self, mock_client: TestClient, mock_server: CloudServer, mock_image_metadata: FileMetadata
+    @pytest.mark.integration
+    async def test_get_thumbnail_endpoint(
+        self, mock_client: AsyncClient, mock_server: CloudServer, mock_image_metadata: FileMetadata
     ) -> None:
-        """Test GET /files/{filepath}/thumbnail endpoint via TestClient."""
+        """Test GET /files/{filepath}/thumbnail endpoint via the async client."""
         # Add file to metadata
         mock_server.metadata_manager.add_file_entries([mock_image_metadata])
 
@@ -774,5 +888,5 @@ class TestGetThumbnailEndpoint:
         thumbnail_path.parent.mkdir(parents=True, exist_ok=True)
         thumbnail_path.write_bytes(b"fake thumbnail data")
 
-        response = mock_client.get(f"/files/{mock_image_metadata.filepath}/thumbnail")
+        response = await mock_client.get(f"/files/{mock_image_metadata.filepath}/thumbnail")
         assert response.status_code == ResponseCode.OK
@@ -1,7 +1,7 @@
 """Unit tests for the thumbnail generator."""
 
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, call, patch
 
 import numpy as np
 from PIL import Image
@@ -24,9 +24,31 @@ class TestImageThumbnailGeneration:
         # Verify thumbnail is a valid JPEG
         img = Image.open(output_path)
         assert img.format == "JPEG"
+        assert img.info.get("progressive")
         assert img.size[0] <= mock_thumbnail_generator.thumbnail_size[0]
         assert img.size[1] <= mock_thumbnail_generator.thumbnail_size[1]
 
+    def test_generate_image_thumbnail_leaves_no_temporary_files(
+        self, mock_thumbnail_generator: ThumbnailGenerator, mock_image_file: Path, tmp_path: Path
+    ) -> None:
+        """Test that thumbnails are written through a temporary file which is renamed into place."""
+        output_path = tmp_path / "thumbnails" / "thumbnail.jpg"
+
+        assert mock_thumbnail_generator.generate_image_thumbnail(mock_image_file, output_path)
+
+        assert list(output_path.parent.iterdir()) == [output_path]
+
+    def test_generate_image_thumbnail_save_error_removes_temporary_file(
+        self, mock_thumbnail_generator: ThumbnailGenerator, mock_image_file: Path, tmp_path: Path
+    ) -> None:
+        """Test that a failed save leaves neither a partial thumbnail nor a temporary file behind."""
+        output_path = tmp_path / "thumbnails" / "thumbnail.jpg"
+
+        with patch.object(Path, "replace", side_effect=OSError("Disk full")):
+            assert not mock_thumbnail_generator.generate_image_thumbnail(mock_image_file, output_path)
+
+        assert list(output_path.parent.iterdir()) == []
+
     def test_generate_image_thumbnail_rgba(self, mock_thumbnail_generator: ThumbnailGenerator, tmp_path: Path) -> None:
         """Test generating a thumbnail from an RGBA image (PNG with transparency)."""
         # Create RGBA image
@@ -80,15 +102,13 @@ class TestThumbnailGeneration:
         with patch("python_cloud_server.thumbnails.cv2") as mock_cv2:
             mock_video = MagicMock()
             mock_video.isOpened.return_value = True
-            mock_video.get.return_value = 30.0  # 30 FPS
             # Create a fake frame (numpy array)
             fake_frame = np.zeros((480, 640, 3), dtype=np.uint8)
             fake_frame[:, :] = [255, 0, 0]  # Red frame
             mock_video.read.return_value = (True, fake_frame)
             mock_cv2.VideoCapture.return_value = mock_video
             mock_cv2.cvtColor.return_value = fake_frame
-            mock_cv2.CAP_PROP_FPS = 5
-            mock_cv2.CAP_PROP_POS_FRAMES = 1
+            mock_cv2.CAP_PROP_POS_MSEC = 0
             mock_cv2.COLOR_BGR2RGB = 4
 
             mock_thumbnail_generator.generate_thumbnail(mock_video_file, "video/mp4", output_path)
@@ -96,6 +116,30 @@ class TestThumbnailGeneration:
             assert output_path.exists()
             img = Image.open(output_path)
             assert img.format == "JPEG"
+            mock_video.set.assert_called_once_with(mock_cv2.CAP_PROP_POS_MSEC, 1000)
+
+    def test_generate_thumbnail_short_video(
+        self, mock_thumbnail_generator: ThumbnailGenerator, mock_video_file: Path, tmp_path: Path
+    ) -> None:
+        """Test generating thumbnail falls back to the first frame for videos shorter than the seek target."""
+        output_path = tmp_path / "thumbnail.jpg"
+
+        with patch("python_cloud_server.thumbnails.cv2") as mock_cv2:
+            mock_video = MagicMock()
+            mock_video.isOpened.return_value = True
+            fake_frame = np.zeros((480, 640, 3), dtype=np.uint8)
+            mock_video.read.side_effect = [(False, None), (True, fake_frame)]
+            mock_cv2.VideoCapture.return_value = mock_video
+            mock_cv2.cvtColor.return_value = fake_frame
+            mock_cv2.CAP_PROP_POS_MSEC = 0
+
+            mock_thumbnail_generator.generate_thumbnail(mock_video_file, "video/mp4", output_path)
+
+            assert output_path.exists()
+            assert mock_video.set.call_args_list == [
+                call(mock_cv2.CAP_PROP_POS_MSEC, 1000),
+                call(mock_cv2.CAP_PROP_POS_MSEC, 0),
+            ]
 
     def test_generate_thumbnail_unsupported_type(
         self, mock_thumbnail_generator: ThumbnailGenerator, tmp_path: Path
@@ -119,3 +163,15 @@ class TestThumbnailGeneration:
 
         assert output_path.exists()
         assert output_path.parent.exists()
+
+    async def test_generate_thumbnail_async(
+        self, mock_thumbnail_generator: ThumbnailGenerator, mock_image_file: Path, tmp_path: Path
+    ) -> None:
+        """Test that generate_thumbnail_async generates the thumbnail off the event loop."""
+        output_path = tmp_path / "thumbnail.jpg"
+
+        await mock_thumbnail_generator.generate_thumbnail_async(mock_image_file, "image/jpeg", output_path)
+
+        assert output_path.exists()
+        with Image.open(output_path) as img:
+            assert img.format == "JPEG"